@@ -8,43 +8,53 @@ NUM_COURIERS = 2
 NUM_PACKAGES = 5
 NUM_TIMESLOTS = 5
 
-# Zaman dilimleri (örnek)
-time_slots = list(range(NUM_TIMESLOTS))
-
-# QUBO değişkenleri: x[c][p][t]
-x = Array.create('x', shape=(NUM_COURIERS, NUM_PACKAGES, NUM_TIMESLOTS), vartype='BINARY')
-
-# 1. Her paket tam bir kez alınmalı
-one_pick_per_package = 0
-for p in range(NUM_PACKAGES):
-    one_pick_per_package += Constraint((sum(x[c][p][t] for c in range(NUM_COURIERS) for t in time_slots) - 1) ** 2, label=f"one_pick_p{p}")
-
-# 2. Kurye kapasitesi (örnek: her kurye aynı anda en fazla 2 paket alabilir)
-courier_capacity = 0
-for c in range(NUM_COURIERS):
-    for t in time_slots:
-        courier_capacity += Constraint((sum(x[c][p][t] for p in range(NUM_PACKAGES)) - 2) ** 2, label=f"cap_c{c}_t{t}")
-
-# 3. Zaman penceresi kısıtı (örnek: paket p sadece t==p zamanında alınabilir, aksi cezalandırılır)
-time_window_penalty = 0
-for p in range(NUM_PACKAGES):
-    for c in range(NUM_COURIERS):
+
+def build_model(num_couriers=NUM_COURIERS, num_packages=NUM_PACKAGES, num_timeslots=NUM_TIMESLOTS, capacity=2):
+    """
+    Verilen problem boyutu için QUBO modelini kurar ve derler.
+    Ceza katsayıları (A, B, C, D) Placeholder olarak kalır; derlenen model
+    farklı feed_dict değerleriyle tekrar tekrar kullanılabilir.
+    """
+    # Zaman dilimleri (örnek)
+    time_slots = list(range(num_timeslots))
+
+    # QUBO değişkenleri: x[c][p][t]
+    x = Array.create('x', shape=(num_couriers, num_packages, num_timeslots), vartype='BINARY')
+
+    # 1. Her paket tam bir kez alınmalı
+    one_pick_per_package = 0
+    for p in range(num_packages):
+        one_pick_per_package += Constraint((sum(x[c][p][t] for c in range(num_couriers) for t in time_slots) - 1) ** 2, label=f"one_pick_p{p}")
+
+    # 2. Kurye kapasitesi (örnek: her kurye aynı anda en fazla 'capacity' paket alabilir)
+    courier_capacity = 0
+    for c in range(num_couriers):
         for t in time_slots:
-            if t != p:  # Sadece örnek için: her paket kendi index zamanında alınmalı
-                time_window_penalty += x[c][p][t]
+            courier_capacity += Constraint((sum(x[c][p][t] for p in range(num_packages)) - capacity) ** 2, label=f"cap_c{c}_t{t}")
+
+    # 3. Zaman penceresi kısıtı (örnek: paket p sadece t==p zamanında alınabilir, aksi cezalandırılır)
+    time_window_penalty = 0
+    for p in range(num_packages):
+        for c in range(num_couriers):
+            for t in time_slots:
+                if t != p:  # Sadece örnek için: her paket kendi index zamanında alınmalı
+                    time_window_penalty += x[c][p][t]
+
+    # 4. Amaç fonksiyonu: makespan (örnek: toplam teslimat süresi)
+    makespan = sum(x[c][p][t] * (t+1) for c in range(num_couriers) for p in range(num_packages) for t in time_slots)
+
+    # QUBO modelini oluştur
+    H = (
+        Placeholder('A') * one_pick_per_package +
+        Placeholder('B') * courier_capacity +
+        Placeholder('C') * time_window_penalty +
+        Placeholder('D') * makespan
+    )
 
-# 4. Amaç fonksiyonu: makespan (örnek: toplam teslimat süresi)
-makespan = sum(x[c][p][t] * (t+1) for c in range(NUM_COURIERS) for p in range(NUM_PACKAGES) for t in time_slots)
+    return H.compile()
 
-# QUBO modelini oluştur
-H = (
-    Placeholder('A') * one_pick_per_package +
-    Placeholder('B') * courier_capacity +
-    Placeholder('C') * time_window_penalty +
-    Placeholder('D') * makespan
-)
 
-model = H.compile()
+model = build_model()
 
 if __name__ == "__main__":
     # Parametreler
@@ -0,0 +1,653 @@
+"""
+Uzun ömürlü yerel çizelgeleme servisi.
+
+Her karar için yeni bir Python süreci başlatmak yerine derlenmiş QUBO/MILP
+modellerini ve sampler'ları bellekte tutar. İşler HTTP (TCP veya Unix soketi)
+üzerinden JSON olarak alınır; aynı boyut ve ceza katsayılı eşzamanlı istekler kısa
+bir pencere içinde toplanıp tek bir sampling çağrısında çözülür. CPU yoğun iş bir worker
+havuzunda çalışır; bekleyen istek sınırı (backpressure) ve istek başına
+deadline uygulanır.
+
+Kullanım:
+    python service.py serve --port 8765
+    python service.py serve --unix /tmp/scheduling.sock
+    python service.py bench --port 8765 --concurrency 16 --requests 400
+
+    curl -s -X POST localhost:8765/schedule -d '{"solver": "neal", "feed_dict": {"C": 3.0}}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+import neal
+
+from qubo_formulation import build_model, NUM_COURIERS, NUM_PACKAGES, NUM_TIMESLOTS
+from solvers.batch_sampler import sample_qubo_batch
+from solvers.milp_baseline import build_milp_model, solve_with_milp
+
+DEFAULT_FEED_DICT = {'A': 5.0, 'B': 5.0, 'C': 2.0, 'D': 1.0}
+DEFAULT_FEED_ITEMS = tuple(sorted(DEFAULT_FEED_DICT.items()))
+DEFAULT_SHAPE = (NUM_COURIERS, NUM_PACKAGES, NUM_TIMESLOTS, 2)
+# dimod.SimulatedAnnealingSampler saf Python referans sampler'ıdır (2x5x5, 100 okuma ~1 dk);
+# servis edilmez, çalışan bir örnekleme durdurulamadığı için bir worker'ı dakikalarca kilitler
+SOLVERS = ('neal', 'milp')
+MAX_VARIABLES = 4096
+# İstemci boyutu seçtiği için her boyut ayrı ayrı ve QUBO'daki ikili terim sayısı sınırlanır
+MAX_DIMENSIONS = {'num_couriers': 32, 'num_packages': 128, 'num_timeslots': 64}
+MAX_INTERACTIONS = 200000
+# Her worker'da bellekte tutulan farklı boyut sayısı
+MODEL_CACHE_SIZE = 8
+# Küçük yeniden planlamalar için varsayılan okuma sayısı; gecikme num_reads ile doğrusal artar
+DEFAULT_NUM_READS = 20
+MAX_NUM_READS = 1000
+MAX_DEADLINE_MS = 30000
+# neal'in varsayılan tavlamasıyla saniyede işlenen yaklaşık okuma x QUBO terimi.
+# İstek başına iş bütçesi deadline'dan türetilir: num_reads * terim <= bu * deadline
+READ_TERMS_PER_SECOND = 400000
+MAX_BODY_BYTES = 1 << 20
+MAX_HEADER_LINES = 100
+# Kullanılabilir çözüm içermeyen CP-SAT durumlarının HTTP karşılıkları
+MILP_STATUS_ERRORS = {
+    'UNKNOWN': (504, 'no MILP solution found before the deadline'),
+    'INFEASIBLE': (422, 'MILP model is infeasible'),
+    'MODEL_INVALID': (500, 'MILP model is invalid'),
+}
+
+SAMPLER_FACTORIES = {
+    'neal': neal.SimulatedAnnealingSampler,
+}
+
+
+# --- Worker tarafı: her worker sürecinde bellekte kalan model ve sampler'lar ---
+
+_SAMPLERS = {}
+
+
+def _get_sampler(solver):
+    if solver not in _SAMPLERS:
+        _SAMPLERS[solver] = SAMPLER_FACTORIES[solver]()
+    return _SAMPLERS[solver]
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _compiled_model(shape):
+    return build_model(*shape)
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _default_qubo(shape):
+    return _compiled_model(shape).to_qubo(feed_dict=DEFAULT_FEED_DICT)
+
+
+def _qubo(shape, feed_items):
+    # Ceza katsayılarını istemci seçer; yalnızca varsayılanlar önbelleğe alınır,
+    # aksi halde her farklı değer bellekte büyük bir QUBO bırakırdı
+    if feed_items == DEFAULT_FEED_ITEMS:
+        return _default_qubo(shape)
+    return _compiled_model(shape).to_qubo(feed_dict=dict(feed_items))
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _milp_model(shape):
+    return build_milp_model(*shape)
+
+
+def _decode_schedule(sample, shape):
+    num_couriers, num_packages, num_timeslots, _ = shape
+    schedule = []
+    for c in range(num_couriers):
+        for p in range(num_packages):
+            for t in range(num_timeslots):
+                if sample.get(f"x[{c}][{p}][{t}]", 0) == 1:
+                    schedule.append({
+                        'courier_id': c,
+                        'package_id': p,
+                        'timeslot': t
+                    })
+    return schedule
+
+
+def warm_shape(shape):
+    """
+    Verilen boyut için modeli derler, sampler'ları kurar ve birer kez çalıştırır.
+    """
+    qubo, _ = _default_qubo(shape)
+    for solver in SAMPLER_FACTORIES:
+        sample_qubo_batch(_get_sampler(solver), qubo, [1])
+    _milp_model(shape)
+
+
+def _init_worker(warm_shapes):
+    for shape in warm_shapes:
+        warm_shape(shape)
+
+
+def run_batch(solver, shape, feed_items, reads_per_request, deadline=None):
+    """
+    Aynı solver, boyut ve ceza katsayılı istekleri tek çözümde çalıştırır; sonuçlar
+    'reads_per_request' sırasıyla döner. 'feed_items' sıralı (ceza adı, değer)
+    demetleridir. 'deadline' (time.time() cinsinden) kuyrukta beklerken geçmişse iş
+    çalıştırılmaz ve None döner.
+    """
+    if deadline is not None and time.time() >= deadline:
+        return None
+    if solver == 'milp':
+        time_limit = None if deadline is None else max(deadline - time.time(), 0.001)
+        res = solve_with_milp(*shape, prebuilt=_milp_model(shape), time_limit=time_limit)
+        result = {
+            'schedule': res['schedule'],
+            'makespan': res['makespan'],
+            'energy': None,
+            'runtime': res['runtime'],
+            'status': res['status_name']
+        }
+        # MILP ceza katsayılarını ve num_reads'i kullanmaz; tüm istekler aynı çözümü paylaşır
+        return [result for _ in reads_per_request]
+
+    qubo, offset = _qubo(shape, feed_items)
+    sampled = sample_qubo_batch(_get_sampler(solver), qubo, reads_per_request, deadline=deadline)
+    if sampled is None:
+        return None  # Deadline örnekleme sırasında geçti
+    samples, runtime = sampled
+    results = []
+    for sample, energy in samples:
+        schedule = _decode_schedule(sample, shape)
+        results.append({
+            'schedule': schedule,
+            'makespan': max([s['timeslot']+1 for s in schedule]) if schedule else None,
+            'energy': energy + offset,
+            'runtime': runtime
+        })
+    return results
+
+
+# --- Servis tarafı (event loop) ---
+
+def interaction_count(shape):
+    """
+    QUBO'daki ikili terim sayısının üst sınırı: paket başına tek-atama kısıtı c*t,
+    (kurye, zaman) başına kapasite kısıtı p değişkenin karesini alır.
+    """
+    num_couriers, num_packages, num_timeslots, _ = shape
+    per_package = num_couriers * num_timeslots
+    return (num_packages * per_package * (per_package - 1) // 2 +
+            per_package * num_packages * (num_packages - 1) // 2)
+
+
+def qubo_terms(shape):
+    """
+    Bir okumanın maliyeti için QUBO terim sayısı tahmini (ikili terimler + değişkenler).
+    """
+    return interaction_count(shape) + shape[0] * shape[1] * shape[2]
+
+
+def parse_job(payload, default_deadline):
+    """
+    JSON isteğini doğrular ve (solver, shape, feed_items, num_reads, deadline) döndürür.
+    Geçersiz alanlarda ValueError fırlatır.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("request body must be a JSON object")
+    solver = payload.get('solver', 'neal')
+    if solver == 'dwave':
+        raise ValueError("solver 'dwave' (dimod reference sampler) is not served, use 'neal'")
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r}, expected one of {SOLVERS}")
+
+    shape = []
+    for field, default in zip(('num_couriers', 'num_packages', 'num_timeslots', 'capacity'), DEFAULT_SHAPE):
+        value = payload.get(field, default)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ValueError(f"{field} must be a positive integer")
+        if field in MAX_DIMENSIONS and value > MAX_DIMENSIONS[field]:
+            raise ValueError(f"{field} must be at most {MAX_DIMENSIONS[field]}")
+        shape.append(value)
+    shape = tuple(shape)
+    if shape[3] > shape[1]:
+        raise ValueError("capacity must not exceed num_packages")
+    if shape[0] * shape[1] * shape[2] > MAX_VARIABLES:
+        raise ValueError(f"problem too large (more than {MAX_VARIABLES} variables)")
+    if interaction_count(shape) > MAX_INTERACTIONS:
+        raise ValueError(f"problem too large (more than {MAX_INTERACTIONS} quadratic terms)")
+
+    feed_dict = dict(DEFAULT_FEED_DICT)
+    overrides = payload.get('feed_dict', {})
+    if not isinstance(overrides, dict):
+        raise ValueError("feed_dict must be an object")
+    for name, value in overrides.items():
+        if name not in DEFAULT_FEED_DICT:
+            raise ValueError(f"unknown penalty {name!r}")
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"penalty {name!r} must be a number")
+        feed_dict[name] = float(value)
+    # MILP ceza katsayılarını kullanmaz; boş anahtar tüm MILP işlerini birleştirir
+    feed_items = () if solver == 'milp' else tuple(sorted(feed_dict.items()))
+
+    num_reads = payload.get('num_reads', DEFAULT_NUM_READS)
+    if not isinstance(num_reads, int) or isinstance(num_reads, bool) or not 1 <= num_reads <= MAX_NUM_READS:
+        raise ValueError(f"num_reads must be an integer in [1, {MAX_NUM_READS}]")
+
+    deadline_ms = payload.get('deadline_ms')
+    if deadline_ms is None:
+        deadline = default_deadline
+    elif (not isinstance(deadline_ms, (int, float)) or isinstance(deadline_ms, bool)
+          or not 0 < deadline_ms <= MAX_DEADLINE_MS):
+        raise ValueError(f"deadline_ms must be a number in (0, {MAX_DEADLINE_MS}]")
+    else:
+        deadline = deadline_ms / 1000.0
+
+    if solver != 'milp' and num_reads * qubo_terms(shape) > READ_TERMS_PER_SECOND * deadline:
+        raise ValueError(f"num_reads={num_reads} cannot finish on this problem size within "
+                         f"{deadline * 1000:.0f} ms; lower num_reads or raise deadline_ms")
+    return solver, shape, feed_items, num_reads, deadline
+
+
+class _PendingBatch:
+    def __init__(self, loop):
+        # İstek başına num_reads; sonuçlar aynı sırayla döner
+        self.reads = []
+        # Toplam okuma x terim; bir batch'in işi bekleyenlerin deadline bütçesini aşmaz
+        self.cost = 0
+        self.requests = 0
+        self.waiters = 0
+        # Bekleyenlerin en geç deadline'ı: bu andan sonra sonucu bekleyen kimse kalmaz
+        self.deadline = 0.0
+        self.future = loop.create_future()
+        # Tüm bekleyenler deadline nedeniyle ayrılırsa hatanın loglanmaması için
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+
+class SchedulingService:
+    """
+    Eşzamanlı istekleri (solver, boyut, ceza katsayıları) anahtarına göre toplayıp
+    worker havuzuna gönderir. Bir batch'teki istekler tek bir sample_qubo çağrısı
+    paylaşır ve her biri kendi num_reads kadar okuma alır. Farklı ceza katsayıları
+    birleştirilmez: neal'in varsayılan beta_range'i birleşik problemden hesaplanır
+    ve bir isteğin sonucu batch'teki diğer isteklere bağlı hale gelirdi.
+    """
+
+    def __init__(self, workers=None, use_threads=False, max_pending=256, batch_window=0.002,
+                 max_batch=32, default_deadline=1.0, warm_shapes=(DEFAULT_SHAPE,)):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_threads = use_threads
+        self.max_pending = max_pending
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.default_deadline = default_deadline
+        self.warm_shapes = tuple(warm_shapes)
+        self.executor = None
+        self.server = None
+        self._open = {}
+        # Kabul edilip batch'i henüz worker'da bitmemiş istek sayısı (backpressure)
+        self._pending = 0
+        self.stats = {'requests': 0, 'batches': 0, 'dropped': 0, 'rejected': 0, 'timeouts': 0, 'errors': 0,
+                      'pool_restarts': 0}
+
+    def _make_executor(self):
+        if self.use_threads:
+            return ThreadPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                      initargs=(self.warm_shapes,))
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.warm_shapes,))
+
+    def _restart_executor(self, broken):
+        """
+        Bozulan havuzu (ör. OOM ile ölen worker sonrası BrokenProcessPool) yenisiyle değiştirir.
+        """
+        if self.executor is not broken:
+            return  # Başka bir batch zaten yeniledi
+        self.stats['pool_restarts'] += 1
+        self.executor = self._make_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        loop = asyncio.get_running_loop()
+        self.executor = self._make_executor()
+        # Havuzdaki tüm worker'ları ilk istekten önce ayağa kaldır
+        await asyncio.gather(*(loop.run_in_executor(self.executor, time.sleep, 0.05)
+                               for _ in range(self.workers)))
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self._handle_connection, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _join(self, key, num_reads, deadline):
+        loop = asyncio.get_running_loop()
+        solver, shape, _ = key
+        cost = 0 if solver == 'milp' else num_reads * qubo_terms(shape)
+        batch = self._open.get(key)
+        if batch is not None and batch.cost + cost > READ_TERMS_PER_SECOND * (deadline - time.time()):
+            # Bu istek eklenirse batch deadline içinde bitmez; mevcut batch'i gönder
+            self._flush(key, batch)
+            batch = None
+        if batch is None:
+            batch = _PendingBatch(loop)
+            batch.future.add_done_callback(lambda f: self._release(batch))
+            self._open[key] = batch
+            loop.call_later(self.batch_window, self._flush, key, batch)
+        position = len(batch.reads)
+        batch.reads.append(num_reads)
+        batch.cost += cost
+        self._pending += 1
+        batch.requests += 1
+        batch.waiters += 1
+        batch.deadline = max(batch.deadline, deadline)
+        if batch.requests >= self.max_batch:
+            self._flush(key, batch)
+        return batch, position
+
+    def _release(self, batch):
+        # İstekler, bekleyen vazgeçse bile worker'daki iş bitene kadar sayılır
+        self._pending -= batch.requests
+
+    async def _wait(self, batch):
+        try:
+            return await asyncio.shield(batch.future)
+        finally:
+            batch.waiters -= 1
+
+    def _flush(self, key, batch):
+        if self._open.get(key) is not batch:
+            return  # Zaten gönderildi
+        del self._open[key]
+        if batch.waiters == 0 or time.time() >= batch.deadline:
+            # Sonucu bekleyen kalmadı; worker'a hiç gönderme
+            self.stats['dropped'] += 1
+            batch.future.set_exception(asyncio.TimeoutError())
+            return
+        self.stats['batches'] += 1
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            work = loop.run_in_executor(executor, run_batch, *key, batch.reads, batch.deadline)
+        except Exception as e:
+            # call_later içinden fırlayan hata loglanıp yutulur; bekleyenlere ilet
+            if isinstance(e, BrokenExecutor):
+                self._restart_executor(executor)
+            batch.future.set_exception(e)
+            return
+
+        def _done(f):
+            if batch.future.done():
+                return
+            if f.cancelled():
+                batch.future.cancel()
+            elif f.exception() is not None:
+                if isinstance(f.exception(), BrokenExecutor):
+                    self._restart_executor(executor)
+                batch.future.set_exception(f.exception())
+            elif f.result() is None:
+                # Worker kuyrukta beklerken deadline geçti
+                self.stats['dropped'] += 1
+                batch.future.set_exception(asyncio.TimeoutError())
+            else:
+                batch.future.set_result(f.result())
+        work.add_done_callback(_done)
+
+    async def handle_job(self, payload):
+        """
+        Tek bir çizelgeleme işini çalıştırır; (HTTP durum kodu, JSON gövdesi) döndürür.
+        """
+        start = time.perf_counter()
+        try:
+            solver, shape, feed_items, num_reads, deadline = parse_job(payload, self.default_deadline)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        if self._pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            return 503, {'error': 'service busy, retry later'}
+
+        self.stats['requests'] += 1
+        batch, position = self._join((solver, shape, feed_items), num_reads, time.time() + deadline)
+        try:
+            result = (await asyncio.wait_for(self._wait(batch), timeout=deadline))[position]
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            return 504, {'error': f'deadline of {deadline * 1000:.0f} ms exceeded'}
+        except asyncio.CancelledError:
+            # Havuz kapatılırken/yenilenirken kuyruktaki iş iptal edilir; istemciyi düşürme
+            if not batch.future.cancelled():
+                raise
+            self.stats['errors'] += 1
+            return 503, {'error': 'worker pool restarted or shutting down, retry later'}
+        except Exception as e:
+            self.stats['errors'] += 1
+            return 500, {'error': f'{type(e).__name__}: {e}'}
+        batch_size = batch.requests
+        if result.get('status') in MILP_STATUS_ERRORS:
+            status, message = MILP_STATUS_ERRORS[result['status']]
+            self.stats['timeouts' if status == 504 else 'errors'] += 1
+            return status, {'error': message, 'status': result['status']}
+
+        body = dict(result)
+        body['solver'] = solver
+        body['batch_size'] = batch_size
+        body['latency_ms'] = (time.perf_counter() - start) * 1000
+        return 200, body
+
+    async def _route(self, method, target, body):
+        path = target.split('?', 1)[0]
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': 'method not allowed'}
+            return 200, {'status': 'ok', 'pending': self._pending, 'workers': self.workers, **self.stats}
+        if path == '/schedule':
+            if method != 'POST':
+                return 405, {'error': 'method not allowed'}
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'error': 'invalid JSON'}
+            return await self.handle_job(payload)
+        return 404, {'error': 'not found'}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await _write_response(writer, 400, {'error': 'malformed request line'}, False)
+                    break
+                method, target, version = parts
+
+                headers = {}
+                for _ in range(MAX_HEADER_LINES + 1):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                else:
+                    await _write_response(writer, 431, {'error': 'too many header lines'}, False)
+                    break
+                if 'transfer-encoding' in headers:
+                    # Yalnızca Content-Length desteklenir; chunked gövde bir sonraki istek sanılmasın
+                    await _write_response(writer, 501, {'error': 'Transfer-Encoding is not supported'}, False)
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    await _write_response(writer, 413, {'error': 'invalid or too large body'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self._route(method, target, body)
+                await _write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 422: 'Unprocessable Entity', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+            501: 'Not Implemented', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+async def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if status == 503:
+        head.append("Retry-After: 1")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+
+# --- Yerel yük testi istemcisi ---
+
+async def _open_connection(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _post(reader, writer, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_bench(host='127.0.0.1', port=8765, unix_path=None, concurrency=16, requests=400, payload=None,
+                    vary_penalties=True):
+    """
+    Çalışan servise 'concurrency' bağlantı üzerinden toplam 'requests' istek gönderir
+    ve gecikme yüzdeliklerini (ms) döndürür. 'vary_penalties' ile her istek farklı bir
+    C katsayısı taşır; böylece istekler birleştirilmez ve her biri ayrı bir yeniden
+    planlama gibi çözülür.
+    """
+    payload = payload or {'solver': 'neal'}
+    latencies = []
+    statuses = {}
+    remaining = [requests]
+
+    def next_payload():
+        if not vary_penalties:
+            return payload
+        feed_dict = dict(payload.get('feed_dict', {}))
+        feed_dict['C'] = DEFAULT_FEED_DICT['C'] + 0.001 * remaining[0]
+        return {**payload, 'feed_dict': feed_dict}
+
+    async def client():
+        reader, writer = await _open_connection(host, port, unix_path)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                body = next_payload()
+                start = time.perf_counter()
+                status, _ = await _post(reader, writer, '/schedule', body)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    return {
+        'requests': len(latencies),
+        'statuses': statuses,
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+    }
+
+
+async def _serve(args):
+    service = SchedulingService(workers=args.workers, use_threads=args.threads, max_pending=args.max_pending,
+                                batch_window=args.batch_window_ms / 1000.0, max_batch=args.max_batch,
+                                default_deadline=args.deadline_ms / 1000.0)
+    server = await service.start(host=args.host, port=args.port, unix_path=args.unix)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Scheduling service listening on {where} ({service.workers} workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local long-lived scheduling service")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('serve', 'bench'):
+        p = sub.add_parser(name)
+        p.add_argument('--host', default='127.0.0.1')
+        p.add_argument('--port', type=int, default=8765)
+        p.add_argument('--unix', default=None, help="Unix socket path (overrides host/port)")
+
+    serve = sub.choices['serve']
+    serve.add_argument('--workers', type=int, default=None)
+    serve.add_argument('--threads', action='store_true', help="Use a thread pool instead of processes")
+    serve.add_argument('--max-pending', type=int, default=256)
+    serve.add_argument('--batch-window-ms', type=float, default=2.0)
+    serve.add_argument('--max-batch', type=int, default=32)
+    serve.add_argument('--deadline-ms', type=float, default=1000.0)
+
+    bench = sub.choices['bench']
+    bench.add_argument('--concurrency', type=int, default=16)
+    bench.add_argument('--requests', type=int, default=400)
+    bench.add_argument('--solver', choices=SOLVERS, default='neal')
+    bench.add_argument('--num-reads', type=int, default=DEFAULT_NUM_READS)
+    bench.add_argument('--same-penalties', action='store_true',
+                       help="Send identical payloads (measures the coalesced case)")
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+    else:
+        report = asyncio.run(run_bench(args.host, args.port, args.unix, args.concurrency, args.requests,
+                                       {'solver': args.solver, 'num_reads': args.num_reads},
+                                       vary_penalties=not args.same_penalties))
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import time
+import numpy as np
+
+
+def sample_qubo_batch(sampler, qubo, reads_per_request, deadline=None, chunk_terms=20000):
+    """
+    Aynı QUBO'yu isteyen birden çok isteği tek bir sample_qubo çağrısında örnekler.
+    Toplam okuma sayısı kadar örnek alınır ve okumalar istekler arasında sırayla bölünür;
+    her istek kendi dilimindeki en düşük enerjili okumayı alır. Okumalar birbirinden
+    bağımsızdır ve tavlama takvimi (beta_range) yalnızca bu QUBO'dan hesaplanır, bu yüzden
+    her isteğin sonucu tek başına çözülmüş gibidir. Farklı ceza katsayılı QUBO'lar
+    birleştirilmez: beta_range birleşik problemden hesaplanıp istekleri birbirine bağlardı.
+    'deadline' (time.time() cinsinden) verilirse okumalar yaklaşık 'chunk_terms'
+    okuma x terim büyüklüğünde parçalar halinde alınır ve parçalar arasında süre
+    kontrol edilir; süre dolarsa örnekleme bırakılır ve None döner.
+    [(best_sample, best_energy), ...] listesi ve toplam çözüm süresi döndürülür.
+    """
+    total = sum(reads_per_request)
+    chunk = total if deadline is None else max(1, chunk_terms // max(len(qubo), 1))
+
+    start = time.time()
+    variables = None
+    samples, energies = [], []
+    done = 0
+    while done < total:
+        if deadline is not None and time.time() >= deadline:
+            return None
+        response = sampler.sample_qubo(qubo, num_reads=min(chunk, total - done))
+        if variables is None:
+            variables = list(response.variables)
+        column = {var: k for k, var in enumerate(response.variables)}
+        # Parçalar arasında değişken sırası aynı tutulur
+        samples.append(response.record.sample[:, [column[var] for var in variables]])
+        energies.append(response.record.energy)
+        done += len(response.record.energy)
+    runtime = time.time() - start
+
+    samples = np.concatenate(samples)
+    energies = np.concatenate(energies)
+
+    results = []
+    first = 0
+    for num_reads in reads_per_request:
+        best = first + int(np.argmin(energies[first:first + num_reads]))
+        best_sample = {var: int(value) for var, value in zip(variables, samples[best])}
+        results.append((best_sample, float(energies[best])))
+        first += num_reads
+    return results, runtime
@@ -1,9 +1,10 @@
 from ortools.sat.python import cp_model
 import time
 
-def solve_with_milp(num_couriers, num_packages, num_timeslots, capacity=2):
+def build_milp_model(num_couriers, num_packages, num_timeslots, capacity=2):
     """
-    Teslimat çizelgeleme problemini MILP olarak çözer.
+    Teslimat çizelgeleme problemi için CP-SAT modelini kurar.
+    (model, x) döndürür; model farklı çözümlerde tekrar kullanılabilir.
     """
     model = cp_model.CpModel()
     x = {}
@@ -37,9 +38,23 @@ def solve_with_milp(num_couriers, num_packages, num_timeslots, capacity=2):
                 model.Add(makespan >= (t+1) * x[c, p, t])
 
     model.Minimize(makespan)
+    return model, x
+
+
+def solve_with_milp(num_couriers, num_packages, num_timeslots, capacity=2, prebuilt=None, time_limit=None):
+    """
+    Teslimat çizelgeleme problemini MILP olarak çözer.
+    'prebuilt' verilirse (build_milp_model çıktısı) model yeniden kurulmaz.
+    'time_limit' (saniye) verilirse CP-SAT bu sürede durur ve bulduğu en iyi çözümü döndürür.
+    """
+    if prebuilt is None:
+        prebuilt = build_milp_model(num_couriers, num_packages, num_timeslots, capacity=capacity)
+    model, x = prebuilt
 
     # Çözümü bul
     solver = cp_model.CpSolver()
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = time_limit
     start = time.time()
     status = solver.Solve(model)
     runtime = time.time() - start
@@ -62,7 +77,8 @@ def solve_with_milp(num_couriers, num_packages, num_timeslots, capacity=2):
         'schedule': schedule,
         'makespan': best_obj,
         'runtime': runtime,
-        'status': status
+        'status': status,
+        'status_name': solver.StatusName(status)
     }
 
 if __name__ == "__main__":
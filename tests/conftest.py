@@ -0,0 +1,5 @@
+import os
+import sys
+
+# src/ modülleri betik olarak çalıştırıldığı gibi düz import edilir (ör. "from paths import ...")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
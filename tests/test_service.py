@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+for _module in ('numpy', 'pyqubo', 'dimod', 'neal', 'ortools'):
+    pytest.importorskip(_module)
+
+import dimod
+import neal
+
+import service
+from solvers.batch_sampler import sample_qubo_batch
+
+
+@asynccontextmanager
+async def serving(**kwargs):
+    """Servisi localhost'ta geçici bir portta (varsayılan olarak thread havuzuyla) başlatır."""
+    kwargs.setdefault('workers', 2)
+    kwargs.setdefault('use_threads', True)
+    svc = service.SchedulingService(**kwargs)
+    server = await svc.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        yield svc, port
+    finally:
+        await svc.close()
+
+
+async def post(port, payload):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        return await service._post(reader, writer, '/schedule', payload)
+    finally:
+        writer.close()
+
+
+def slow_run_batch(delay):
+    def run_batch(solver, shape, feed_items, reads_per_request, deadline=None):
+        time.sleep(delay)
+        return [{'schedule': [], 'makespan': None, 'energy': 0.0, 'runtime': delay} for _ in reads_per_request]
+    return run_batch
+
+
+def test_concurrent_same_shape_requests_are_coalesced():
+    async def scenario():
+        async with serving(batch_window=0.05) as (svc, port):
+            # Farklı num_reads değerleri de aynı sampling çağrısında birleşir
+            responses = await asyncio.gather(*(post(port, {'solver': 'neal', 'num_reads': 5 + n})
+                                               for n in range(8)))
+            return svc.stats, responses
+
+    stats, responses = asyncio.run(scenario())
+    assert all(status == 200 for status, _ in responses)
+    assert max(body['batch_size'] for _, body in responses) > 1
+    assert stats['batches'] < len(responses)
+    assert all(body['schedule'] for _, body in responses)
+
+
+def test_different_penalties_are_not_batched_together():
+    async def scenario():
+        async with serving(batch_window=0.05) as (svc, port):
+            return await asyncio.gather(
+                post(port, {'num_reads': 10, 'feed_dict': {'C': 2.0}}),
+                post(port, {'num_reads': 10, 'feed_dict': {'C': 50.0}}),
+            )
+
+    responses = asyncio.run(scenario())
+    assert [body['batch_size'] for _, body in responses] == [1, 1]
+
+
+def test_rejects_with_503_when_max_pending_exceeded(monkeypatch):
+    monkeypatch.setattr(service, 'run_batch', slow_run_batch(0.3))
+
+    async def scenario():
+        async with serving(max_pending=1, batch_window=0.001) as (svc, port):
+            return await asyncio.gather(*(post(port, {'num_reads': n}) for n in range(1, 5)))
+
+    statuses = sorted(status for status, _ in asyncio.run(scenario()))
+    assert statuses[0] == 200
+    assert 503 in statuses
+
+
+def test_short_deadline_returns_504_and_releases_capacity(monkeypatch):
+    monkeypatch.setattr(service, 'run_batch', slow_run_batch(0.2))
+
+    async def scenario():
+        async with serving(max_pending=4) as (svc, port):
+            response = await post(port, {'deadline_ms': 20, 'num_reads': 10})
+            # Bekleyen vazgeçse de iş worker'da bitene kadar kapasite tutulur
+            held = svc._pending
+            await asyncio.sleep(0.4)
+            return response, held, svc._pending
+
+    (status, body), held, released = asyncio.run(scenario())
+    assert status == 504
+    assert 'deadline' in body['error']
+    assert held == 1
+    assert released == 0
+
+
+def test_batch_cancelled_by_pool_restart_returns_503(monkeypatch):
+    monkeypatch.setattr(service, 'run_batch', slow_run_batch(0.2))
+
+    async def scenario():
+        async with serving(workers=1, warm_shapes=()) as (svc, port):
+            # Tek worker: ilk batch çalışırken ikincisi kuyrukta bekler
+            running = asyncio.ensure_future(post(port, {'num_reads': 10, 'feed_dict': {'C': 1.0}}))
+            queued = asyncio.ensure_future(post(port, {'num_reads': 10, 'feed_dict': {'C': 3.0}}))
+            await asyncio.sleep(0.05)
+            svc._restart_executor(svc.executor)
+            return await running, await queued
+
+    (running_status, _), (queued_status, body) = asyncio.run(scenario())
+    assert running_status == 200
+    assert queued_status == 503
+    assert 'retry' in body['error']
+
+
+@pytest.mark.parametrize('milp_status, expected', [
+    ('OPTIMAL', 200),
+    ('FEASIBLE', 200),
+    ('UNKNOWN', 504),
+    ('INFEASIBLE', 422),
+])
+def test_milp_status_is_reported_and_mapped(monkeypatch, milp_status, expected):
+    def run_batch(solver, shape, feed_items, reads_per_request, deadline=None):
+        schedule = [] if milp_status in ('UNKNOWN', 'INFEASIBLE') else [{'courier_id': 0, 'package_id': 0, 'timeslot': 0}]
+        return [{'schedule': schedule, 'makespan': 1 if schedule else None, 'energy': None,
+                 'runtime': 0.0, 'status': milp_status} for _ in reads_per_request]
+    monkeypatch.setattr(service, 'run_batch', run_batch)
+
+    async def scenario():
+        async with serving(warm_shapes=()) as (svc, port):
+            return await post(port, {'solver': 'milp'})
+
+    status, body = asyncio.run(scenario())
+    assert status == expected
+    assert body['status'] == milp_status
+
+
+@pytest.mark.parametrize('payload', [
+    [],
+    {'solver': 'qaoa'},
+    {'solver': 'dwave'},
+    {'num_couriers': 8, 'num_packages': 40, 'num_timeslots': 10, 'num_reads': 100},
+    {'deadline_ms': 10 ** 6},
+    {'num_packages': 0},
+    {'num_couriers': True},
+    {'num_couriers': 1, 'num_packages': 4096, 'num_timeslots': 1},
+    {'num_couriers': 4, 'num_packages': 40, 'num_timeslots': 40},
+    # Boyut ve değişken sınırlarını geçer, ikili terim sınırına takılır
+    {'num_couriers': 2, 'num_packages': 64, 'num_timeslots': 32},
+    {'capacity': 9},
+    {'feed_dict': {'Z': 1.0}},
+    {'feed_dict': {'A': 'high'}},
+    {'num_reads': 0},
+    {'deadline_ms': -5},
+])
+def test_invalid_payloads_return_400(payload):
+    async def scenario():
+        async with serving(warm_shapes=()) as (svc, port):
+            return await post(port, payload)
+
+    status, body = asyncio.run(scenario())
+    assert status == 400
+    assert body['error']
+
+
+def test_interaction_cap_rejects_shapes_within_other_limits():
+    shape = {'num_couriers': 2, 'num_packages': 64, 'num_timeslots': 32}
+    assert 2 * 64 * 32 <= service.MAX_VARIABLES
+    with pytest.raises(ValueError, match='quadratic terms'):
+        service.parse_job(shape, 1.0)
+
+
+def test_invalid_json_and_chunked_bodies_are_rejected():
+    async def raw(port, data):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def scenario():
+        async with serving(warm_shapes=()) as (svc, port):
+            invalid = await raw(port, b"POST /schedule HTTP/1.1\r\nContent-Length: 3\r\nConnection: close\r\n\r\n{x}")
+            chunked = await raw(port, b"POST /schedule HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n")
+            return invalid, chunked
+
+    invalid, chunked = asyncio.run(scenario())
+    assert invalid.startswith(b"HTTP/1.1 400")
+    assert chunked.startswith(b"HTTP/1.1 501")
+    assert b"Connection: close" in chunked
+
+
+def test_sample_qubo_batch_matches_solo_solves():
+    qubo = {('a', 'a'): 1.0, ('b', 'b'): -2.0, ('c', 'c'): -1.0, ('b', 'c'): -1.0, ('a', 'c'): 0.5}
+    sampler = neal.SimulatedAnnealingSampler()
+    reads = [5, 20, 1]
+    batched, _ = sample_qubo_batch(sampler, qubo, reads)
+    assert len(batched) == len(reads)
+    solo = sampler.sample_qubo(qubo, num_reads=20).first.energy
+    for sample, energy in batched:
+        assert energy == pytest.approx(solo)
+        assert energy == pytest.approx(dimod.BinaryQuadraticModel.from_qubo(qubo).energy(sample))
+
+
+def test_small_replan_p50_latency_under_load():
+    async def scenario():
+        # Gerçek dağıtımdaki gibi süreç havuzu; her istek farklı bir C katsayısıyla
+        # varsayılan num_reads'te çözülür, yani birleştirme/önbellek yardımı yoktur
+        async with serving(use_threads=False, workers=None) as (svc, port):
+            return await service.run_bench(port=port, concurrency=8, requests=200,
+                                           payload={'solver': 'neal'}, vary_penalties=True)
+
+    report = asyncio.run(scenario())
+    assert report['statuses'] == {200: 200}
+    assert report['p50_ms'] < 100